@@ -7,15 +7,19 @@ CSVデータから学生の学習状況を分析し、
 
 import pandas as pd
 import os
-from dataclasses import dataclass
+import string
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 
 # ============================================
 # データクラス定義
 # ============================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FieldScore:
     """分野別スコア"""
     field_name: str
@@ -23,21 +27,16 @@ class FieldScore:
     school_avg: float
     total_questions: int
     total_correct: int
+    diff: float = field(init=False)        # 学校平均との差分
+    is_weak: bool = field(init=False)      # 不得意分野かどうか（学校平均-10%以上）
+    is_strong: bool = field(init=False)    # 得意分野かどうか（学校平均+5%以上）
     
-    @property
-    def diff(self) -> float:
-        """学校平均との差分"""
-        return self.score - self.school_avg
-    
-    @property
-    def is_weak(self) -> bool:
-        """不得意分野かどうか（学校平均-10%以上）"""
-        return self.diff <= -10
-    
-    @property
-    def is_strong(self) -> bool:
-        """得意分野かどうか（学校平均+5%以上）"""
-        return self.diff >= 5
+    def __post_init__(self):
+        """派生値を生成時に一度だけ計算"""
+        diff = self.score - self.school_avg
+        object.__setattr__(self, 'diff', diff)
+        object.__setattr__(self, 'is_weak', diff <= -10)
+        object.__setattr__(self, 'is_strong', diff >= 5)
 
 
 @dataclass
@@ -48,42 +47,43 @@ class StudentData:
     field_scores: List[FieldScore]
     total_questions: int
     total_correct: int
+    total_accuracy: float = field(init=False)          # 総合正答率
+    weak_fields: List[FieldScore] = field(init=False)    # 不得意分野リスト
+    strong_fields: List[FieldScore] = field(init=False)  # 得意分野リスト
+    fields_by_score: List[FieldScore] = field(init=False)  # 正答率降順の全分野リスト
+    evaluation_level: str = field(init=False)          # 総合評価レベル
+    safe_filename: str = field(init=False)             # 出力ファイル名（学籍番号_氏名、空白を_に置換）
     
-    @property
-    def total_accuracy(self) -> float:
-        """総合正答率"""
+    def __post_init__(self):
+        """集計値を生成時に一度だけ計算"""
+        # 氏名の空白除去後に同じ名前になる学生がいるため、学籍番号を含めて一意にする
+        self.safe_filename = f"{self.student_id}_{self.name}".replace(' ', '_')
+        
         if self.total_questions == 0:
-            return 0
-        return (self.total_correct / self.total_questions) * 100
-    
-    @property
-    def weak_fields(self) -> List[FieldScore]:
-        """不得意分野リスト"""
-        return sorted([f for f in self.field_scores if f.is_weak], 
-                      key=lambda x: x.diff)
-    
-    @property
-    def strong_fields(self) -> List[FieldScore]:
-        """得意分野リスト"""
-        return sorted([f for f in self.field_scores if f.is_strong], 
-                      key=lambda x: x.diff, reverse=True)
+            self.total_accuracy = 0
+        else:
+            self.total_accuracy = (self.total_correct / self.total_questions) * 100
+        
+        # 差分順に一度だけソートし、不得意・得意分野は両端のスライスで取得
+        by_diff = sorted(self.field_scores, key=lambda x: x.diff)
+        diffs = [f.diff for f in by_diff]
+        self.weak_fields = by_diff[:bisect_right(diffs, -10)]
+        self.strong_fields = by_diff[bisect_left(diffs, 5):][::-1]
+        self.fields_by_score = sorted(self.field_scores, key=lambda x: x.score, reverse=True)
+        
+        if self.total_accuracy >= 70:
+            self.evaluation_level = "優秀"
+        elif self.total_accuracy >= 50:
+            self.evaluation_level = "良好"
+        elif self.total_accuracy >= 35:
+            self.evaluation_level = "要注意"
+        else:
+            self.evaluation_level = "要改善"
     
     @property
     def weak_field_count(self) -> int:
         """不得意分野数"""
         return len(self.weak_fields)
-    
-    @property
-    def evaluation_level(self) -> str:
-        """総合評価レベル"""
-        if self.total_accuracy >= 70:
-            return "優秀"
-        elif self.total_accuracy >= 50:
-            return "良好"
-        elif self.total_accuracy >= 35:
-            return "要注意"
-        else:
-            return "要改善"
 
 
 # ============================================
@@ -100,52 +100,72 @@ class CSVDataExtractor:
         
     def load(self):
         """CSVファイルを読み込み"""
-        self.df = pd.read_csv(self.csv_path)
+        # 必要な列のみ型を指定して読み込み
+        # 繰り返しの多い文字列列はカテゴリ型にしてグループ化を高速化
+        self.df = pd.read_csv(
+            self.csv_path,
+            usecols=['学籍番号', '氏名', '分野', '問題数', '正答数'],
+            dtype={
+                '学籍番号': 'category',
+                '氏名': 'category',
+                '分野': 'category',
+                '問題数': 'int32',
+                '正答数': 'int32'
+            },
+            engine='c',
+            low_memory=False
+        )
         self._calculate_school_avg()
         
     def _calculate_school_avg(self):
         """分野別の学校平均を計算"""
-        for field in self.df['分野'].unique():
-            field_data = self.df[self.df['分野'] == field]
-            total_q = field_data['問題数'].sum()
-            total_c = field_data['正答数'].sum()
-            self.school_avg[field] = (total_c / total_q * 100) if total_q > 0 else 0
+        sums = self.df.groupby('分野', sort=False, observed=True)[['問題数', '正答数']].sum()
+        avg = (sums['正答数'] / sums['問題数'] * 100).where(sums['問題数'] > 0, 0)
+        self.school_avg = avg.to_dict()
     
     def extract_all_students(self) -> List[StudentData]:
         """全学生のデータを抽出"""
         students = []
         
-        # 学籍番号でグループ化
-        for student_id in self.df['学籍番号'].unique():
-            student_data = self.df[self.df['学籍番号'] == student_id]
-            name = student_data['氏名'].iloc[0]
-            
-            # 分野別スコア
-            field_scores = []
-            for field in student_data['分野'].unique():
-                field_records = student_data[student_data['分野'] == field]
-                total_q = field_records['問題数'].sum()
-                total_c = field_records['正答数'].sum()
-                score = (total_c / total_q * 100) if total_q > 0 else 0
-                
-                field_scores.append(FieldScore(
-                    field_name=field,
-                    score=score,
-                    school_avg=self.school_avg[field],
-                    total_questions=int(total_q),
-                    total_correct=int(total_c)
-                ))
-            
+        # 学籍番号・分野で一括集計（出現順を維持）
+        agg = self.df.groupby(
+            ['学籍番号', '分野'], sort=False, observed=True
+        )[['問題数', '正答数']].sum()
+        
+        # 氏名は学籍番号ごとに最初に出現したものを使う（表記ゆれがあっても1名として扱う）
+        first_names = self.df.drop_duplicates('学籍番号').set_index('学籍番号')['氏名'].to_dict()
+        
+        # 分野別正答率はループ外でまとめて計算
+        rates = (agg['正答数'] / agg['問題数'] * 100).where(agg['問題数'] > 0, 0)
+        
+        # 行ごとのSeries生成を避けるため、インデックスと値をPythonのリストとして取り出す
+        student_ids = agg.index.get_level_values(0).tolist()
+        field_names = agg.index.get_level_values(1).tolist()
+        questions = agg['問題数'].to_numpy().tolist()
+        corrects = agg['正答数'].to_numpy().tolist()
+        scores = rates.to_numpy().tolist()
+        
+        # 分野別スコア（学生の初出順を維持して振り分け）
+        field_scores_by_student: Dict[str, List[FieldScore]] = {}
+        for student_id, field_name, total_q, total_c, score in zip(
+            student_ids, field_names, questions, corrects, scores
+        ):
+            field_scores_by_student.setdefault(student_id, []).append(FieldScore(
+                field_name=field_name,
+                score=score,
+                school_avg=self.school_avg[field_name],
+                total_questions=total_q,
+                total_correct=total_c
+            ))
+        
+        for student_id, field_scores in field_scores_by_student.items():
             # 学生データを作成
-            total_q = student_data['問題数'].sum()
-            total_c = student_data['正答数'].sum()
-            
             student = StudentData(
                 student_id=student_id,
-                name=name,
+                name=first_names[student_id],
                 field_scores=field_scores,
-                total_questions=int(total_q),
-                total_correct=int(total_c)
+                total_questions=sum(f.total_questions for f in field_scores),
+                total_correct=sum(f.total_correct for f in field_scores)
             )
             students.append(student)
         
@@ -156,44 +176,64 @@ class CSVDataExtractor:
 # コメント生成モジュール
 # ============================================
 
+# コメント断片のメモ化の上限（学生数程度で十分）
+COMMENT_CACHE_SIZE = 256
+
+
 class CommentGenerator:
-    """コメント生成クラス"""
+    """コメント生成クラス
+    
+    各コメントは少数の区分（正答数・評価レベル・弱点分野）と表示用に整形済みの値で決まるため、
+    入力が重なりやすい断片はメモ化し、同じ入力では同じ文字列を再利用する
+    （総合正答率を含むコメントは学生ごとにほぼ一意なのでメモ化しない）
+    """
     
-    def generate_kirihima_comment(self, student: StudentData) -> str:
-        """桐島凛子先生のコメント生成（厳しめ）"""
+    def generate_kirihima_comment(self, student: StudentData, sep: str = "\n") -> str:
+        """桐島凛子先生のコメント生成（厳しめ）。sepで文の区切りを指定（HTMLなら"<br>"）"""
         comments = []
         
         # 正答数に関するコメント
-        comments.append(self._kirihima_study_comment(student))
+        comments.append(self._kirihima_study_comment(student.total_correct))
         
         # 正答率に関するコメント
-        comments.append(self._kirihima_score_comment(student))
+        weak_names = tuple(f.field_name for f in student.weak_fields)
+        comments.append(self._kirihima_score_comment(
+            student.evaluation_level, f"{student.total_accuracy:.1f}", weak_names
+        ))
         
         # 改善アドバイス
         if student.weak_field_count > 0:
-            comments.append(self._kirihima_advice(student))
+            worst = student.weak_fields[0]
+            comments.append(self._kirihima_advice(
+                worst.field_name, f"{worst.score:.1f}", f"{abs(worst.diff):.1f}"
+            ))
         
-        return "\n".join([c for c in comments if c])
+        return sep.join([c for c in comments if c])
     
-    def generate_yamada_comment(self, student: StudentData) -> str:
-        """山田陽介先生のコメント生成（励まし）"""
+    def generate_yamada_comment(self, student: StudentData, sep: str = "\n") -> str:
+        """山田陽介先生のコメント生成（励まし）。sepで文の区切りを指定（HTMLなら"<br>"）"""
         comments = []
         
         # 正答数に関するコメント
-        comments.append(self._yamada_study_comment(student))
+        comments.append(self._yamada_study_comment(student.total_correct))
         
         # 正答率に関するコメント
-        comments.append(self._yamada_score_comment(student))
+        if student.strong_fields:
+            best = student.strong_fields[0]
+            comments.append(self._yamada_score_comment(best.field_name, f"{best.score:.1f}", True))
+        else:
+            comments.append(self._yamada_score_comment(None, "", student.total_accuracy >= 50))
         
         # 励ましアドバイス
-        comments.append(self._yamada_advice(student))
+        worst_name = student.weak_fields[0].field_name if student.weak_fields else None
+        comments.append(self._yamada_advice(worst_name))
         
-        return "\n".join([c for c in comments if c])
+        return sep.join([c for c in comments if c])
     
-    def _kirihima_study_comment(self, student: StudentData) -> str:
+    @staticmethod
+    @lru_cache(maxsize=COMMENT_CACHE_SIZE)
+    def _kirihima_study_comment(total_correct: int) -> str:
         """桐島先生の正答数コメント"""
-        total_correct = student.total_correct
-        
         if total_correct >= 180:
             return f"正答数{total_correct}問と、素晴らしい成果です。知識が定着していますね。"
         elif total_correct >= 120:
@@ -203,32 +243,30 @@ class CommentGenerator:
         else:
             return f"正答数{total_correct}問です。まずは正答数を増やすことから始めましょう。"
     
-    def _kirihima_score_comment(self, student: StudentData) -> str:
-        """桐島先生の正答率コメント"""
-        accuracy = student.total_accuracy
-        weak_count = student.weak_field_count
-        
-        if accuracy >= 70:
-            return f"総合正答率{accuracy:.1f}%と素晴らしい成績です。この調子で本番も頑張りましょう。"
-        elif accuracy >= 50:
-            if weak_count > 0:
-                weak_names = [f.field_name for f in student.weak_fields]
-                return f"総合正答率{accuracy:.1f}%と良好ですが、{', '.join(weak_names)}が弱点です。重点的に復習しましょう。"
-            return f"総合正答率{accuracy:.1f}%と概ね良好です。油断せず継続してください。"
-        elif accuracy >= 35:
-            return f"総合正答率{accuracy:.1f}%と、まだ合格ラインには達していません。基礎からの復習が必要です。"
+    @staticmethod
+    def _kirihima_score_comment(level: str, accuracy: str, weak_names: tuple) -> str:
+        """桐島先生の正答率コメント（levelは総合評価レベル、accuracyは表示用に整形済み）"""
+        if level == "優秀":
+            return f"総合正答率{accuracy}%と素晴らしい成績です。この調子で本番も頑張りましょう。"
+        elif level == "良好":
+            if weak_names:
+                return f"総合正答率{accuracy}%と良好ですが、{', '.join(weak_names)}が弱点です。重点的に復習しましょう。"
+            return f"総合正答率{accuracy}%と概ね良好です。油断せず継続してください。"
+        elif level == "要注意":
+            return f"総合正答率{accuracy}%と、まだ合格ラインには達していません。基礎からの復習が必要です。"
         else:
-            return f"総合正答率{accuracy:.1f}%と深刻な状況です。抜本的な対策が必要です。"
+            return f"総合正答率{accuracy}%と深刻な状況です。抜本的な対策が必要です。"
     
-    def _kirihima_advice(self, student: StudentData) -> str:
-        """桐島先生の改善アドバイス"""
-        worst = student.weak_fields[0]
-        return f"特に{worst.field_name}は{worst.score:.1f}%と学校平均を{abs(worst.diff):.1f}%下回っています。集中的に取り組んでください。"
+    @staticmethod
+    @lru_cache(maxsize=COMMENT_CACHE_SIZE)
+    def _kirihima_advice(field_name: str, score: str, shortfall: str) -> str:
+        """桐島先生の改善アドバイス（score・shortfallは表示用に整形済み）"""
+        return f"特に{field_name}は{score}%と学校平均を{shortfall}%下回っています。集中的に取り組んでください。"
     
-    def _yamada_study_comment(self, student: StudentData) -> str:
+    @staticmethod
+    @lru_cache(maxsize=COMMENT_CACHE_SIZE)
+    def _yamada_study_comment(total_correct: int) -> str:
         """山田先生の正答数コメント"""
-        total_correct = student.total_correct
-        
         if total_correct >= 180:
             return f"{total_correct}問も正解してる！すごい実力だね！"
         elif total_correct >= 120:
@@ -238,23 +276,23 @@ class CommentGenerator:
         else:
             return f"正答数{total_correct}問だね。一つずつ正解を増やしていこう！"
     
-    def _yamada_score_comment(self, student: StudentData) -> str:
-        """山田先生の正答率コメント"""
-        strong_fields = student.strong_fields
-        
-        if strong_fields:
-            best = strong_fields[0]
-            return f"{best.field_name}が{best.score:.1f}%、すごいじゃん！得意分野をしっかり持ってるね！"
-        elif student.total_accuracy >= 50:
+    @staticmethod
+    @lru_cache(maxsize=COMMENT_CACHE_SIZE)
+    def _yamada_score_comment(best_name: Optional[str], best_score: str, is_balanced: bool) -> str:
+        """山田先生の正答率コメント（best_scoreは表示用に整形済み）"""
+        if best_name is not None:
+            return f"{best_name}が{best_score}%、すごいじゃん！得意分野をしっかり持ってるね！"
+        elif is_balanced:
             return "全体的にバランスよく取れてるね！いい感じだよ！"
         else:
             return "苦手分野があっても大丈夫！一つずつクリアしていけば、必ず力がつくよ！"
     
-    def _yamada_advice(self, student: StudentData) -> str:
+    @staticmethod
+    @lru_cache(maxsize=COMMENT_CACHE_SIZE)
+    def _yamada_advice(worst_name: Optional[str]) -> str:
         """山田先生の励ましアドバイス"""
-        if student.weak_field_count > 0:
-            worst = student.weak_fields[0]
-            return f"まずは{worst.field_name}から取り組んでみよう！一緒に頑張ろう！"
+        if worst_name is not None:
+            return f"まずは{worst_name}から取り組んでみよう！一緒に頑張ろう！"
         else:
             return "この調子で本番まで駆け抜けよう！君ならできる！"
 
@@ -263,367 +301,281 @@ class CommentGenerator:
 # 出力モジュール（HTML）
 # ============================================
 
-class ReportGenerator:
-    """レポート出力クラス"""
-    
-    def __init__(self, output_dir: str = "output"):
-        self.output_dir = output_dir
-        self.comment_generator = CommentGenerator()
-        os.makedirs(output_dir, exist_ok=True)
-        os.makedirs(f"{output_dir}/html", exist_ok=True)
-    
-    def _get_evaluation_class(self, level: str) -> str:
-        """評価レベルに応じたCSSクラスを返す"""
-        mapping = {
-            "優秀": "evaluation-excellent",
-            "良好": "evaluation-good",
-            "要注意": "evaluation-warning",
-            "要改善": "evaluation-critical"
-        }
-        return mapping.get(level, "")
-    
-    def _generate_advices(self, student: StudentData) -> List[str]:
-        """学習アドバイスを生成"""
-        advices = []
-        
-        if student.total_accuracy < 50:
-            advices.append("基礎問題から着実に理解を深めましょう")
-        
-        if student.weak_fields:
-            worst = student.weak_fields[0]
-            advices.append(f"特に{worst.field_name}は重点的に復習することをおすすめします")
-        
-        if student.strong_fields:
-            advices.append("得意分野は維持しつつ、さらに得点源として磨きましょう")
-        
-        advices.append("毎日の学習習慣を継続することが合格への近道です")
-        
-        return advices[:3]
-    
-    def generate_html(self, student: StudentData, period: str = "2026年2月") -> str:
-        """学生のHTMLレポートを生成"""
-        
-        # 得意分野HTML
-        strong_html = ""
-        for f in student.strong_fields[:3]:
-            strong_html += f'''
-                <div class="field-item strong">
-                    <span class="field-name">{f.field_name}</span>
-                    <span class="field-score">{f.score:.1f}%</span>
-                    <span class="field-diff">(+{f.diff:.1f}%)</span>
-                </div>
-            '''
-        if not strong_html:
-            strong_html = '<div class="field-item">該当なし</div>'
-        
-        # 不得意分野HTML
-        weak_html = ""
-        for f in student.weak_fields[:3]:
-            weak_html += f'''
-                <div class="field-item weak">
-                    <span class="field-name">{f.field_name}</span>
-                    <span class="field-score">{f.score:.1f}%</span>
-                    <span class="field-diff">({f.diff:.1f}%)</span>
-                </div>
-            '''
-        if not weak_html:
-            weak_html = '<div class="field-item">該当なし</div>'
-        
-        # 全分野HTML
-        all_fields_html = ""
-        for f in sorted(student.field_scores, key=lambda x: x.score, reverse=True):
-            diff_sign = "+" if f.diff >= 0 else ""
-            field_class = "strong" if f.is_strong else ("weak" if f.is_weak else "")
-            all_fields_html += f'''
-                <div class="field-item {field_class}">
-                    <span class="field-name">{f.field_name}</span>
-                    <span class="field-score">{f.score:.1f}%</span>
-                    <span class="field-diff">({diff_sign}{f.diff:.1f}%)</span>
-                </div>
-            '''
-        
-        # 教員コメント
-        kirihima_comment = self.comment_generator.generate_kirihima_comment(student)
-        yamada_comment = self.comment_generator.generate_yamada_comment(student)
-        
-        # アドバイスHTML
-        advices = self._generate_advices(student)
-        advices_html = ""
-        for advice in advices:
-            advices_html += f"<li>{advice}</li>\n"
-        
-        # HTMLテンプレート
-        html = f'''<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>学習状況レポート - {student.name}</title>
-    <style>
-        @page {{
+# レポート共通のスタイル（全学生で共通のため一度だけ生成）
+CSS_BLOCK = '''    <style>
+        @page {
             size: A4;
             margin: 15mm;
-        }}
+        }
 
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: "Hiragino Kaku Gothic ProN", "Meiryo", sans-serif;
             font-size: 11pt;
             line-height: 1.5;
             color: #333;
             background: #fff;
-        }}
+        }
 
-        .report-container {{
+        .report-container {
             max-width: 210mm;
             min-height: 297mm;
             margin: 0 auto;
             padding: 15mm;
             background: #fff;
-        }}
+        }
 
-        .header {{
+        .header {
             text-align: center;
             border-bottom: 3px solid #2c3e50;
             padding-bottom: 10px;
             margin-bottom: 15px;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 18pt;
             color: #2c3e50;
             margin-bottom: 5px;
-        }}
+        }
 
-        .header .period {{
+        .header .period {
             font-size: 12pt;
             color: #666;
-        }}
+        }
 
-        .student-info {{
+        .student-info {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 12px 20px;
             border-radius: 8px;
             margin-bottom: 15px;
-        }}
+        }
 
-        .student-info .name {{
+        .student-info .name {
             font-size: 16pt;
             font-weight: bold;
-        }}
+        }
 
-        .summary-box {{
+        .summary-box {
             display: grid;
             grid-template-columns: repeat(4, 1fr);
             gap: 10px;
             margin-bottom: 15px;
-        }}
+        }
 
-        .summary-item {{
+        .summary-item {
             background: #f8f9fa;
             border: 1px solid #e9ecef;
             border-radius: 8px;
             padding: 10px;
             text-align: center;
-        }}
+        }
 
-        .summary-item .label {{
+        .summary-item .label {
             font-size: 9pt;
             color: #666;
             margin-bottom: 3px;
-        }}
+        }
 
-        .summary-item .value {{
+        .summary-item .value {
             font-size: 14pt;
             font-weight: bold;
             color: #2c3e50;
-        }}
+        }
 
-        .evaluation-excellent {{ color: #27ae60; }}
-        .evaluation-good {{ color: #3498db; }}
-        .evaluation-warning {{ color: #f39c12; }}
-        .evaluation-critical {{ color: #e74c3c; }}
+        .evaluation-excellent { color: #27ae60; }
+        .evaluation-good { color: #3498db; }
+        .evaluation-warning { color: #f39c12; }
+        .evaluation-critical { color: #e74c3c; }
 
-        .section {{
+        .section {
             margin-bottom: 15px;
-        }}
+        }
 
-        .section-title {{
+        .section-title {
             font-size: 12pt;
             font-weight: bold;
             color: #2c3e50;
             border-left: 4px solid #667eea;
             padding-left: 10px;
             margin-bottom: 8px;
-        }}
+        }
 
-        .field-list {{
+        .field-list {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 8px;
-        }}
+        }
 
-        .field-item {{
+        .field-item {
             display: flex;
             justify-content: space-between;
             padding: 6px 10px;
             background: #f8f9fa;
             border-radius: 4px;
             font-size: 10pt;
-        }}
+        }
 
-        .field-item.strong {{
+        .field-item.strong {
             background: #e8f5e9;
             border-left: 3px solid #27ae60;
-        }}
+        }
 
-        .field-item.weak {{
+        .field-item.weak {
             background: #ffebee;
             border-left: 3px solid #e74c3c;
-        }}
+        }
 
-        .field-name {{ flex: 1; }}
-        .field-score {{ font-weight: bold; }}
-        .field-diff {{
+        .field-name { flex: 1; }
+        .field-score { font-weight: bold; }
+        .field-diff {
             font-size: 9pt;
             color: #666;
             margin-left: 8px;
-        }}
+        }
 
-        .comments-section {{
+        .comments-section {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 15px;
             margin-bottom: 15px;
-        }}
+        }
 
-        .comment-box {{
+        .comment-box {
             border-radius: 10px;
             padding: 12px;
-        }}
+        }
 
-        .comment-box.kirihima {{
+        .comment-box.kirihima {
             background: linear-gradient(135deg, #e8eaf6 0%, #c5cae9 100%);
             border: 1px solid #9fa8da;
-        }}
+        }
 
-        .comment-box.yamada {{
+        .comment-box.yamada {
             background: linear-gradient(135deg, #fff3e0 0%, #ffe0b2 100%);
             border: 1px solid #ffcc80;
-        }}
+        }
 
-        .teacher-name {{
+        .teacher-name {
             font-size: 11pt;
             font-weight: bold;
             margin-bottom: 8px;
             display: flex;
             align-items: center;
             gap: 5px;
-        }}
+        }
 
-        .teacher-name.kirihima {{ color: #3f51b5; }}
-        .teacher-name.yamada {{ color: #e65100; }}
+        .teacher-name.kirihima { color: #3f51b5; }
+        .teacher-name.yamada { color: #e65100; }
 
-        .comment-text {{
+        .comment-text {
             font-size: 10pt;
             line-height: 1.6;
             color: #333;
-        }}
+        }
 
-        .advice-section {{
+        .advice-section {
             background: #e3f2fd;
             border: 1px solid #90caf9;
             border-radius: 8px;
             padding: 12px;
-        }}
+        }
 
-        .advice-title {{
+        .advice-title {
             font-size: 11pt;
             font-weight: bold;
             color: #1565c0;
             margin-bottom: 8px;
-        }}
+        }
 
-        .advice-list {{
+        .advice-list {
             list-style: none;
             padding: 0;
-        }}
+        }
 
-        .advice-list li {{
+        .advice-list li {
             font-size: 10pt;
             padding: 4px 0;
             padding-left: 20px;
             position: relative;
-        }}
+        }
 
-        .advice-list li::before {{
+        .advice-list li::before {
             content: "✓";
             position: absolute;
             left: 0;
             color: #1565c0;
             font-weight: bold;
-        }}
+        }
 
-        .footer {{
+        .footer {
             text-align: center;
             font-size: 9pt;
             color: #999;
             margin-top: 20px;
             padding-top: 10px;
             border-top: 1px solid #eee;
-        }}
+        }
 
-        @media print {{
-            body {{
+        @media print {
+            body {
                 -webkit-print-color-adjust: exact;
                 print-color-adjust: exact;
-            }}
-            .report-container {{
+            }
+            .report-container {
                 page-break-after: always;
-            }}
-        }}
-    </style>
+            }
+        }
+    </style>'''
+
+# HTMLテンプレート
+HTML_TEMPLATE = string.Template('''<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>学習状況レポート - $name</title>
+''' + CSS_BLOCK + '''
 </head>
 <body>
     <div class="report-container">
         <header class="header">
             <h1>📊 ドリル学習状況レポート</h1>
-            <p class="period">{period}</p>
+            <p class="period">$period</p>
         </header>
 
         <div class="student-info">
-            <span class="name">{student.name}</span>
+            <span class="name">$name</span>
         </div>
 
         <div class="summary-box">
             <div class="summary-item">
                 <div class="label">総問題数</div>
-                <div class="value">{student.total_questions:,}問</div>
+                <div class="value">$total_questions問</div>
             </div>
             <div class="summary-item">
                 <div class="label">総正答数</div>
-                <div class="value">{student.total_correct:,}問</div>
+                <div class="value">$total_correct問</div>
             </div>
             <div class="summary-item">
                 <div class="label">総合正答率</div>
-                <div class="value">{student.total_accuracy:.1f}%</div>
+                <div class="value">$total_accuracy%</div>
             </div>
             <div class="summary-item">
                 <div class="label">総合評価</div>
-                <div class="value {self._get_evaluation_class(student.evaluation_level)}">{student.evaluation_level}</div>
+                <div class="value $evaluation_class">$evaluation_level</div>
             </div>
         </div>
 
         <div class="section">
             <h2 class="section-title">📈 分野別成績</h2>
             <div class="field-list">
-                {all_fields_html}
+                $all_fields_html
             </div>
         </div>
 
@@ -633,7 +585,7 @@ class ReportGenerator:
                     💎 桐島 凛子 先生より
                 </div>
                 <div class="comment-text">
-                    {kirihima_comment.replace(chr(10), "<br>")}
+                    $kirihima_comment
                 </div>
             </div>
 
@@ -642,7 +594,7 @@ class ReportGenerator:
                     ☀️ 山田 陽介 先生より
                 </div>
                 <div class="comment-text">
-                    {yamada_comment.replace(chr(10), "<br>")}
+                    $yamada_comment
                 </div>
             </div>
         </div>
@@ -650,25 +602,124 @@ class ReportGenerator:
         <div class="advice-section">
             <h3 class="advice-title">📝 学習アドバイス</h3>
             <ul class="advice-list">
-                {advices_html}
+                $advices_html
             </ul>
         </div>
 
         <footer class="footer">
-            生成日: {datetime.now().strftime("%Y年%m月%d日")} | ドリル学習フィードバックシステム
+            生成日: $generated_date | ドリル学習フィードバックシステム
         </footer>
     </div>
 </body>
-</html>'''
+</html>''')
+
+
+# 分野ごとの行テンプレート（差分は符号付きで表示）
+FIELD_ITEM_TEMPLATE = '''
+                <div class="field-item {field_class}">
+                    <span class="field-name">{field.field_name}</span>
+                    <span class="field-score">{field.score:.1f}%</span>
+                    <span class="field-diff">({field.diff:+.1f}%)</span>
+                </div>
+            '''
+
+# 該当分野がない場合の表示
+NO_FIELD_HTML = '<div class="field-item">該当なし</div>'
+
+
+class ReportGenerator:
+    """レポート出力クラス"""
+    
+    def __init__(self, output_dir: str = "output"):
+        self.output_dir = output_dir
+        self.comment_generator = CommentGenerator()
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(f"{output_dir}/html", exist_ok=True)
+    
+    def _get_evaluation_class(self, level: str) -> str:
+        """評価レベルに応じたCSSクラスを返す"""
+        mapping = {
+            "優秀": "evaluation-excellent",
+            "良好": "evaluation-good",
+            "要注意": "evaluation-warning",
+            "要改善": "evaluation-critical"
+        }
+        return mapping.get(level, "")
+    
+    def _generate_advices(self, student: StudentData) -> List[str]:
+        """学習アドバイスを生成"""
+        advices = []
+        
+        if student.total_accuracy < 50:
+            advices.append("基礎問題から着実に理解を深めましょう")
+        
+        if student.weak_fields:
+            worst = student.weak_fields[0]
+            advices.append(f"特に{worst.field_name}は重点的に復習することをおすすめします")
+        
+        if student.strong_fields:
+            advices.append("得意分野は維持しつつ、さらに得点源として磨きましょう")
+        
+        advices.append("毎日の学習習慣を継続することが合格への近道です")
+        
+        return advices[:3]
+    
+    def generate_html(self, student: StudentData, period: str = "2026年2月") -> str:
+        """学生のHTMLレポートを生成"""
+        
+        # 得意分野HTML
+        strong_html = "".join(
+            FIELD_ITEM_TEMPLATE.format(field_class="strong", field=f)
+            for f in student.strong_fields[:3]
+        ) or NO_FIELD_HTML
+        
+        # 不得意分野HTML
+        weak_html = "".join(
+            FIELD_ITEM_TEMPLATE.format(field_class="weak", field=f)
+            for f in student.weak_fields[:3]
+        ) or NO_FIELD_HTML
+        
+        # 全分野HTML
+        all_fields_html = "".join(
+            FIELD_ITEM_TEMPLATE.format(
+                field_class="strong" if f.is_strong else ("weak" if f.is_weak else ""),
+                field=f
+            )
+            for f in student.fields_by_score
+        )
+        
+        # 教員コメント
+        kirihima_comment = self.comment_generator.generate_kirihima_comment(student, sep="<br>")
+        yamada_comment = self.comment_generator.generate_yamada_comment(student, sep="<br>")
+        
+        # アドバイスHTML
+        advices = self._generate_advices(student)
+        advices_html = "".join(f"<li>{advice}</li>\n" for advice in advices)
+        
+        # HTMLテンプレートに埋め込み
+        html = HTML_TEMPLATE.substitute(
+            name=student.name,
+            period=period,
+            total_questions=f"{student.total_questions:,}",
+            total_correct=f"{student.total_correct:,}",
+            total_accuracy=f"{student.total_accuracy:.1f}",
+            evaluation_class=self._get_evaluation_class(student.evaluation_level),
+            evaluation_level=student.evaluation_level,
+            all_fields_html=all_fields_html,
+            kirihima_comment=kirihima_comment,
+            yamada_comment=yamada_comment,
+            advices_html=advices_html,
+            generated_date=datetime.now().strftime("%Y年%m月%d日")
+        )
         
         return html
     
     def save_html(self, student: StudentData, period: str = "2026年2月") -> str:
         """HTMLファイルを保存"""
         html = self.generate_html(student, period)
-        filename = f"{self.output_dir}/html/{student.name.replace(' ', '_')}.html"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html)
+        filename = f"{self.output_dir}/html/{student.safe_filename}.html"
+        # エンコード済みのバイト列を一度に書き込む
+        Path(filename).write_bytes(html.encode('utf-8'))
         return filename
     
     def generate_all(self, students: List[StudentData], period: str = "2026年2月") -> List[str]:
@@ -703,8 +754,8 @@ if __name__ == "__main__":
         
         # 学校平均表示
         print("\n[学校平均正答率]")
-        for field, avg in extractor.school_avg.items():
-            print(f"  - {field}: {avg:.1f}%")
+        for field_name, avg in extractor.school_avg.items():
+            print(f"  - {field_name}: {avg:.1f}%")
         
         # コメント生成テスト
         print("\n[Phase 2] コメント生成テスト...")
@@ -11,6 +11,24 @@ import glob
 import os
 
 
+# 入力CSVのうち集計に使用する列とその型
+INPUT_COLUMNS = ['学籍番号', '氏名', '日付', '分野', '問題数', '正答数']
+INPUT_DTYPES = {
+    '学籍番号': 'str',
+    '氏名': 'str',
+    '日付': 'str',
+    '分野': 'str',
+    '問題数': 'int32',
+    '正答数': 'int32'
+}
+
+# 氏名から除去する文字の変換テーブル（正規表現 [\s_＿] と同じ文字集合）
+# 空白文字はすべて U+3000 以下にあるため、その範囲から isspace() で抽出する
+NAME_DELETE_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(0x3001)) if c.isspace()
+) + '_＿')
+
+
 def load_csv_files(directory: str) -> pd.DataFrame:
     """指定ディレクトリ内の入力CSVファイルを読み込んで結合"""
     # 入力ファイルのみを対象（出力ファイル「学習記録_統合」を除外）
@@ -26,25 +44,42 @@ def load_csv_files(directory: str) -> pd.DataFrame:
     for f in csv_files:
         print(f"  - {os.path.basename(f)}")
     
-    dfs = []
-    for file in csv_files:
-        df = pd.read_csv(file, encoding='utf-8')
-        # 氏名の正規化（スペース、タブ、アンダースコア、全角スペース、全角アンダースコアを除去）
-        if '氏名' in df.columns:
-            df['氏名'] = df['氏名'].astype(str).str.replace(r'[\s_＿]+', '', regex=True)
-        dfs.append(df)
+    # 読み込んだDataFrameをリストに保持せず、ジェネレータで直接結合
+    df = pd.concat(
+        (
+            pd.read_csv(
+                file,
+                encoding='utf-8',
+                usecols=INPUT_COLUMNS,
+                dtype=INPUT_DTYPES,
+                engine='c',
+                low_memory=False
+            )
+            for file in csv_files
+        ),
+        ignore_index=True
+    )
+    
+    # 氏名の正規化（スペース、タブ、アンダースコア、全角スペース、全角アンダースコアを除去）
+    df['氏名'] = df['氏名'].str.translate(NAME_DELETE_TABLE)
     
-    return pd.concat(dfs, ignore_index=True)
+    # 繰り返しの多い文字列列はカテゴリ型にしてグループ化を高速化
+    for c in ('学籍番号', '氏名', '分野'):
+        df[c] = df[c].astype('category')
+    
+    return df
 
 
 def integrate_records(df: pd.DataFrame) -> pd.DataFrame:
     """同一学籍番号・同一日・同一分野のレコードを統合"""
     
-    # 日付を統一フォーマットに変換
-    df['日付'] = pd.to_datetime(df['日付']).dt.strftime('%Y/%m/%d')
+    # 日付を統一フォーマットに変換（種類が少ないので一意な値だけ変換して対応付け）
+    dates = df['日付'].unique()
+    date_map = dict(zip(dates, pd.to_datetime(dates).strftime('%Y/%m/%d')))
+    df['日付'] = df['日付'].map(date_map)
     
     # グループ化して集計
-    grouped = df.groupby(['学籍番号', '氏名', '日付', '分野']).agg({
+    grouped = df.groupby(['学籍番号', '氏名', '日付', '分野'], observed=True).agg({
         '問題数': 'sum',
         '正答数': 'sum'
     }).reset_index()
@@ -64,32 +99,19 @@ def sort_records(df: pd.DataFrame) -> pd.DataFrame:
 def create_matrix_format(df: pd.DataFrame, output_path: str):
     """マトリクス形式のExcelファイルを作成"""
     
-    # ピボットテーブル作成（問題数）
-    pivot_questions = df.pivot_table(
-        index=['学籍番号', '氏名'],
-        columns=['日付', '分野'],
-        values='問題数',
-        aggfunc='sum',
-        fill_value=0
-    )
+    # 問題数・正答数を一度だけ集計し、各マトリクスはその結果から展開
+    grouped = df.groupby(
+        ['学籍番号', '氏名', '日付', '分野'], observed=True
+    )[['問題数', '正答数']].sum()
     
-    # ピボットテーブル作成（正答数）
-    pivot_correct = df.pivot_table(
-        index=['学籍番号', '氏名'],
-        columns=['日付', '分野'],
-        values='正答数',
-        aggfunc='sum',
-        fill_value=0
-    )
+    # マトリクス作成（問題数）
+    pivot_questions = grouped['問題数'].unstack(['日付', '分野'], fill_value=0).sort_index(axis=1)
     
-    # ピボットテーブル作成（正答率）
-    pivot_rate = df.pivot_table(
-        index=['学籍番号', '氏名'],
-        columns=['日付', '分野'],
-        values='正答率(%)',
-        aggfunc='mean',
-        fill_value=0
-    )
+    # マトリクス作成（正答数）
+    pivot_correct = grouped['正答数'].unstack(['日付', '分野'], fill_value=0).sort_index(axis=1)
+    
+    # マトリクス作成（正答率）
+    pivot_rate = (pivot_correct / pivot_questions * 100).round(1).fillna(0)
     
     # Excelに出力
     with pd.ExcelWriter(output_path, engine='openpyxl') as writer: